@@ -2,19 +2,87 @@
 import sys
 import json
 import math
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 
+# orjson parses/serializes several times faster than stdlib json and handles
+# numpy scalars natively; fall back to stdlib when it isn't installed
 try:
-    from ikpy.chain import Chain
-    from ikpy.link import OriginLink, URDFLink
-except Exception as e:
-    print(json.dumps({"error": "ikpy not available", "details": str(e)}))
-    sys.exit(1)
-
-# Optional Robotics Toolbox (for ctraj / SE3 interpolation) – import lazily in main
-SE3 = None  # type: ignore
-ctraj = None  # type: ignore
-
+    import orjson
+
+    def loads(s):
+        return orjson.loads(s)
+
+    def dumps(o):
+        return orjson.dumps(o, option=orjson.OPT_SERIALIZE_NUMPY).decode()
+except ImportError:
+    loads = json.loads
+
+    def dumps(o):
+        # stdlib fallback: unwrap any numpy values orjson would have handled
+        return json.dumps(o, default=lambda v: v.tolist())
+
+# ikpy is only needed for the optimizer fallback; import lazily so the
+# common analytic path doesn't pay its scipy-heavy import cost at startup
+Chain = None  # type: ignore
+OriginLink = None  # type: ignore
+URDFLink = None  # type: ignore
+
+
+def _import_ikpy():
+    global Chain, OriginLink, URDFLink
+    if Chain is None:
+        from ikpy.chain import Chain as _Chain
+        from ikpy.link import OriginLink as _OriginLink
+        from ikpy.link import URDFLink as _URDFLink
+        Chain = _Chain
+        OriginLink = _OriginLink
+        URDFLink = _URDFLink
+
+
+# Joint vector length of the collapsed chain (origin + 4 joints + effector)
+N_LINKS = 6
+
+# Batch-kernel dtype. The UI consumes angles at ~1-degree resolution and
+# positions for rendering, so float32's ~1e-6 relative error (well under
+# 1e-4 x arm length end-to-end) is invisible there while halving bandwidth
+# and doubling SIMD width in the compiled loop. The Python/ikpy fallback
+# stays float64 (ikpy is float64 internally anyway).
+DTYPE = np.float32
+
+# Shared zero initial-guess prototype; treated as immutable (copy to mutate)
+_ZERO_INIT = [0.0] * N_LINKS
+
+# Fixed wrist offsets baked into the chain (not configurable from the UI)
+WRIST_LEFT_LEN = 4.0
+WRIST_UP_LEN = 5.0
+
+# Derived geometry tuples keyed by link lengths, shared with the chain cache
+_GEOM_CACHE: dict[tuple, tuple] = {}
+
+
+def build_geom(cfg):
+    """Link lengths plus the derived constants the analytic solver reuses
+    for every pose in a request: (base, shoulder, ankle, ankle2, forearm,
+    x_off, shoulder_y)."""
+    key = (
+        float(cfg.get("baseLength", 3)),
+        float(cfg.get("shoulderLength", 4)),
+        float(cfg.get("ankleLength", 10)),
+        float(cfg.get("ankle2Length", 4)),
+        float(cfg.get("forearmLength", 10)),
+    )
+    geom = _GEOM_CACHE.get(key)
+    if geom is None:
+        base_len, shoulder_len, ankle_len, ankle2_len, forearm_len = key
+        geom = _GEOM_CACHE[key] = key + (
+            # Net offset along the pitch axis (yaw-frame X)
+            -shoulder_len + ankle2_len - WRIST_LEFT_LEN,
+            # Planar vertical of the shoulder joint (includes the base -1 drop)
+            base_len - 1.0,
+        )
+    return geom
 
 def clamp(v: float, lo: float, hi: float) -> float:
     return max(lo, min(hi, v))
@@ -24,29 +92,98 @@ def to_deg(rad: float) -> float:
     return rad * 180.0 / math.pi
 
 
-def vec_from_frame(frame):
-    # frame: 4x4
-    return [float(frame[0, 3]), float(frame[1, 3]), float(frame[2, 3])]
-
+def orientation_angle_between(q_prev: np.ndarray, q_curr: np.ndarray) -> float:
+    # Geodesic angle between two rotations stored as unit quaternions:
+    # 2*acos(|<q_prev, q_curr>|), the abs folding the double cover. One dot
+    # product instead of any matrix work; clamp for numerical stability
+    dot = abs(float(np.dot(q_prev, q_curr)))
+    return 2.0 * math.acos(1.0 if dot > 1.0 else dot)
+
+
+def _quat_from_rot(R):
+    """Shepperd's method: 3x3 rotation matrix -> quaternion (w, x, y, z)."""
+    r00, r11, r22 = R[0, 0], R[1, 1], R[2, 2]
+    tr = r00 + r11 + r22
+    if tr >= r00 and tr >= r11 and tr >= r22:
+        s = math.sqrt(tr + 1.0) * 2.0
+        return (0.25 * s, (R[2, 1] - R[1, 2]) / s, (R[0, 2] - R[2, 0]) / s, (R[1, 0] - R[0, 1]) / s)
+    if r00 >= r11 and r00 >= r22:
+        s = math.sqrt(1.0 + r00 - r11 - r22) * 2.0
+        return ((R[2, 1] - R[1, 2]) / s, 0.25 * s, (R[0, 1] + R[1, 0]) / s, (R[0, 2] + R[2, 0]) / s)
+    if r11 >= r22:
+        s = math.sqrt(1.0 + r11 - r00 - r22) * 2.0
+        return ((R[0, 2] - R[2, 0]) / s, (R[0, 1] + R[1, 0]) / s, 0.25 * s, (R[1, 2] + R[2, 1]) / s)
+    s = math.sqrt(1.0 + r22 - r00 - r11) * 2.0
+    return ((R[1, 0] - R[0, 1]) / s, (R[0, 2] + R[2, 0]) / s, (R[1, 2] + R[2, 1]) / s, 0.25 * s)
+
+
+def _rot_from_quat(w, x, y, z):
+    """Quaternion -> 3x3 rotation matrix (R = I + 2w[u]x + 2[u]x^2)."""
+    return np.array([
+        [1.0 - 2.0 * (y * y + z * z), 2.0 * (x * y - w * z), 2.0 * (x * z + w * y)],
+        [2.0 * (x * y + w * z), 1.0 - 2.0 * (x * x + z * z), 2.0 * (y * z - w * x)],
+        [2.0 * (x * z - w * y), 2.0 * (y * z + w * x), 1.0 - 2.0 * (x * x + y * y)],
+    ])
 
-def rot_from_frame(frame):
-    # Returns 3x3 rotation matrix (numpy array)
-    return np.array([[float(frame[0, 0]), float(frame[0, 1]), float(frame[0, 2])],
-                     [float(frame[1, 0]), float(frame[1, 1]), float(frame[1, 2])],
-                     [float(frame[2, 0]), float(frame[2, 1]), float(frame[2, 2])]])
 
+def _interp_se3_batch(A0, A1, ts):
+    """All interpolated frames between A0 and A1 as one (N,4,4) array.
 
-def orientation_angle_between(R_prev: np.ndarray, R_curr: np.ndarray) -> float:
-    # Computes the geodesic angle between two rotations using trace formula
-    # Clamp for numerical stability
-    R_delta = R_prev.T.dot(R_curr)
-    tr = float(np.trace(R_delta))
-    cos_theta = (tr - 1.0) * 0.5
-    if cos_theta > 1.0:
-        cos_theta = 1.0
-    elif cos_theta < -1.0:
-        cos_theta = -1.0
-    return float(math.acos(cos_theta))
+    Rotation follows q(t) = q0 * (q0^-1 * q1)^t with the delta quaternion
+    raised to every fraction in a single broadcast; translation is a plain
+    lerp. Replaces per-step SE3 construction entirely.
+    """
+    ts = np.asarray(ts, dtype=np.float64)
+    q0 = np.array(_quat_from_rot(A0[:3, :3]))
+    q1 = np.array(_quat_from_rot(A1[:3, :3]))
+    if float(np.dot(q0, q1)) < 0.0:
+        q1 = -q1
+    # dq = conj(q0) * q1
+    w0, x0, y0, z0 = q0[0], -q0[1], -q0[2], -q0[3]
+    w1, x1, y1, z1 = q1
+    dw = w0 * w1 - x0 * x1 - y0 * y1 - z0 * z1
+    dx = w0 * x1 + x0 * w1 + y0 * z1 - z0 * y1
+    dy = w0 * y1 - x0 * z1 + y0 * w1 + z0 * x1
+    dz = w0 * z1 + x0 * y1 - y0 * x1 + z0 * w1
+    half = math.acos(-1.0 if dw < -1.0 else (1.0 if dw > 1.0 else dw))
+    s = math.sin(half)
+    n = ts.shape[0]
+    if dw > 0.9995:
+        # Near-identity delta: nlerp between 1 and dq avoids the acos/sin
+        # tail entirely (and covers the s == 0 degenerate case)
+        dq_t = np.empty((n, 4))
+        dq_t[:, 0] = 1.0 + ts * (dw - 1.0)
+        dq_t[:, 1:] = ts[:, None] * np.array([dx, dy, dz])
+    else:
+        axis = np.array([dx, dy, dz]) / s
+        half_t = half * ts
+        dq_t = np.empty((n, 4))
+        dq_t[:, 0] = np.cos(half_t)
+        dq_t[:, 1:] = axis * np.sin(half_t)[:, None]
+    # q_t = q0 * dq_t for all rows at once: left-multiplication matrix of q0
+    # turns the Hamilton product into a single matmul
+    w0, x0, y0, z0 = q0
+    L = np.array([
+        [w0, -x0, -y0, -z0],
+        [x0, w0, -z0, y0],
+        [y0, z0, w0, -x0],
+        [z0, -y0, x0, w0],
+    ])
+    q_t = dq_t @ L.T
+    q_t /= np.linalg.norm(q_t, axis=1, keepdims=True)
+    w, x, y, z = q_t[:, 0], q_t[:, 1], q_t[:, 2], q_t[:, 3]
+    out = np.broadcast_to(np.eye(4), (n, 4, 4)).copy()
+    out[:, 0, 0] = 1.0 - 2.0 * (y * y + z * z)
+    out[:, 0, 1] = 2.0 * (x * y - w * z)
+    out[:, 0, 2] = 2.0 * (x * z + w * y)
+    out[:, 1, 0] = 2.0 * (x * y + w * z)
+    out[:, 1, 1] = 1.0 - 2.0 * (x * x + z * z)
+    out[:, 1, 2] = 2.0 * (y * z - w * x)
+    out[:, 2, 0] = 2.0 * (x * z - w * y)
+    out[:, 2, 1] = 2.0 * (y * z + w * x)
+    out[:, 2, 2] = 1.0 - 2.0 * (x * x + y * y)
+    out[:, :3, 3] = A0[:3, 3] + ts[:, None] * (A1[:3, 3] - A0[:3, 3])
+    return out
 
 
 def normalize_quaternion_sign_for_endpoints(A0, A1):
@@ -54,21 +191,16 @@ def normalize_quaternion_sign_for_endpoints(A0, A1):
     Accepts 4x4 transforms (numpy-like); returns possibly adjusted 4x4 for A1.
     """
     try:
-        # Lazy import to avoid adding a hard dependency at module load
-        from scipy.spatial.transform import Rotation as SciRot  # type: ignore
-        R0 = np.array([[float(A0[0, 0]), float(A0[0, 1]), float(A0[0, 2])],
-                       [float(A0[1, 0]), float(A0[1, 1]), float(A0[1, 2])],
-                       [float(A0[2, 0]), float(A0[2, 1]), float(A0[2, 2])]])
-        R1 = np.array([[float(A1[0, 0]), float(A1[0, 1]), float(A1[0, 2])],
-                       [float(A1[1, 0]), float(A1[1, 1]), float(A1[1, 2])],
-                       [float(A1[2, 0]), float(A1[2, 1]), float(A1[2, 2])]])
-        q0 = SciRot.from_matrix(R0).as_quat()  # [x,y,z,w]
-        q1 = SciRot.from_matrix(R1).as_quat()
-        if float(np.dot(q0, q1)) < 0.0:
-            q1 = -q1
-        R1n = SciRot.from_quat(q1).as_matrix()
+        # Inline Shepperd extraction: no scipy Rotation objects on this path
+        R0 = np.ascontiguousarray(np.asarray(A0, dtype=np.float64)[:3, :3])
+        R1 = np.ascontiguousarray(np.asarray(A1, dtype=np.float64)[:3, :3])
+        q0 = _quat_from_rot(R0)
+        q1 = _quat_from_rot(R1)
+        dot = q0[0] * q1[0] + q0[1] * q1[1] + q0[2] * q1[2] + q0[3] * q1[3]
+        if dot >= 0.0:
+            return A1
         A1n = np.array(A1, dtype=float).copy()
-        A1n[0:3, 0:3] = R1n
+        A1n[0:3, 0:3] = _rot_from_quat(-q1[0], -q1[1], -q1[2], -q1[3])
         return A1n
     except Exception:
         return A1
@@ -79,26 +211,269 @@ def angle_diff(a: float, b: float) -> float:
     return (float(a) - float(b) + math.pi) % (2.0 * math.pi) - math.pi
 
 
+def analytic_ik(geom, target_pos, init_guess, n_links, target_frame=None):
+    """Closed-form IK for the yaw + 3x coplanar-pitch chain built by build_chain.
+
+    After the base yaw, every X translation (shoulder, ankle2, wrist_left) lies
+    along the shared pitch axis and sums to one constant out-of-plane offset, so
+    the remaining problem is a 3-link planar arm (ankle, forearm, wrist_up) that
+    reduces to a law-of-cosines 2-link solve once the wrist direction is fixed.
+    Returns a full joint vector compatible with the chain, or None when no
+    candidate satisfies the joint bounds (caller falls back to the optimizer).
+    """
+    base_len, shoulder_len, ankle_len, ankle2_len, forearm_len, x_off, shoulder_y = geom
+
+    tx, ty, tz = (float(target_pos[0]), float(target_pos[1]), float(target_pos[2]))
+    r2 = tx * tx + tz * tz
+    z2 = r2 - x_off * x_off
+    if z2 < -1e-9:
+        return None  # target inside the out-of-plane offset cylinder
+    z_abs = math.sqrt(max(z2, 0.0))
+    alpha_t = math.atan2(tz, tx)
+
+    v = ty - shoulder_y  # planar vertical, measured from the shoulder joint
+    L1, L2, L3 = ankle_len, forearm_len, WRIST_UP_LEN
+
+    # Seed the wrist direction from the initial guess for continuity
+    phi_init = float(init_guess[2]) + float(init_guess[3]) + float(init_guess[4])
+    # When a full target frame is given, its pitch is another good wrist
+    # direction: for R = Ry(yaw) @ Rx(phi), row 1 is (0, cos phi, -sin phi)
+    phi_frame = None
+    if target_frame is not None:
+        try:
+            phi_frame = math.atan2(-float(target_frame[1, 2]), float(target_frame[1, 1]))
+        except Exception:
+            phi_frame = None
+
+    def planar_solve(u, phi, elbow):
+        # Subtract the wrist link pointing at pitch phi, then 2-link IK
+        wu = u - L3 * math.sin(phi)
+        wv = v - L3 * math.cos(phi)
+        d2 = wu * wu + wv * wv
+        cos_q3 = (d2 - L1 * L1 - L2 * L2) / (2.0 * L1 * L2)
+        if cos_q3 > 1.0 or cos_q3 < -1.0:
+            return None
+        q3 = elbow * math.acos(cos_q3)
+        q2 = math.atan2(wu, wv) - math.atan2(L2 * math.sin(q3), L1 + L2 * math.cos(q3))
+        q4 = angle_diff(phi, q2 + q3)
+        if not (-math.pi / 2 <= q2 <= math.pi / 2):
+            return None
+        lim = 3 * math.pi / 4
+        if not (-lim <= q3 <= lim and -lim <= q4 <= lim):
+            return None
+        return (q2, q3, q4)
+
+    best = None
+    best_cost = None
+    for z_sign in (1.0, -1.0):
+        u = z_sign * z_abs
+        q1 = angle_diff(math.atan2(u, x_off), alpha_t)
+        # Wrist-direction candidates: previous pose first, then pointing the
+        # wrist link along the target ray, then a coarse grid so folded poses
+        # (wrist link doubling back) are still found without an optimizer
+        phis = [phi_init, math.atan2(u, v)]
+        if phi_frame is not None:
+            phis.insert(1, phi_frame)
+        phis.extend(k * math.pi / 12.0 for k in range(-12, 13))
+        for phi in phis:
+            for elbow in (1.0, -1.0):
+                sol = planar_solve(u, phi, elbow)
+                if sol is None:
+                    continue
+                q2, q3, q4 = sol
+                cost = (
+                    10.0 * angle_diff(q1, init_guess[1]) ** 2
+                    + angle_diff(q2, init_guess[2]) ** 2
+                    + angle_diff(q3, init_guess[3]) ** 2
+                    + 2.0 * angle_diff(q4, init_guess[4]) ** 2
+                )
+                if best is None or cost < best_cost:
+                    ik = [0.0] * n_links
+                    ik[1], ik[2], ik[3], ik[4] = q1, q2, q3, q4
+                    best = ik
+                    best_cost = cost
+    return best
+
+
+# Optional numba JIT of the analytic IK + bone FK over a whole trajectory:
+# one compiled loop instead of N Python-level candidate searches
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+_solve_batch = None
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _solve_batch(targets, params, init_q):  # pragma: no cover - compiled
+        # targets: (N,3) world positions; params: the five link lengths;
+        # init_q: (4,) warm start for the first row. Returns per-row joint
+        # angles (N,4), bone points (N,8,3) and a reachability flag (N,).
+        # Mirrors analytic_ik + the bone math in solve_pose.
+        n = targets.shape[0]
+        angles = np.zeros((n, 4), np.float32)
+        pts = np.zeros((n, 8, 3), np.float32)
+        ok = np.zeros(n, np.bool_)
+        base_len, shoulder_len, ankle_len, ankle2_len, forearm_len = (
+            params[0], params[1], params[2], params[3], params[4])
+        x_off = -shoulder_len + ankle2_len - 4.0
+        shoulder_y = base_len - 1.0
+        L1, L2, L3 = ankle_len, forearm_len, 5.0
+        lim = 3.0 * math.pi / 4.0
+        two_pi = 2.0 * math.pi
+        prev = init_q.copy()
+        for i in range(n):
+            tx, ty, tz = targets[i, 0], targets[i, 1], targets[i, 2]
+            z2 = tx * tx + tz * tz - x_off * x_off
+            best_cost = 1e30
+            found = False
+            bq1 = bq2 = bq3 = bq4 = 0.0
+            if z2 >= -1e-9:
+                z_abs = math.sqrt(max(z2, 0.0))
+                alpha_t = math.atan2(tz, tx)
+                v = ty - shoulder_y
+                phi_init = prev[1] + prev[2] + prev[3]
+                for zs in range(2):
+                    u = z_abs if zs == 0 else -z_abs
+                    q1 = (math.atan2(u, x_off) - alpha_t + math.pi) % two_pi - math.pi
+                    for pk in range(27):
+                        if pk == 0:
+                            phi = phi_init
+                        elif pk == 1:
+                            phi = math.atan2(u, v)
+                        else:
+                            phi = (pk - 14) * math.pi / 12.0
+                        wu = u - L3 * math.sin(phi)
+                        wv = v - L3 * math.cos(phi)
+                        cq3 = (wu * wu + wv * wv - L1 * L1 - L2 * L2) / (2.0 * L1 * L2)
+                        if cq3 > 1.0 or cq3 < -1.0:
+                            continue
+                        for es in range(2):
+                            q3 = math.acos(cq3) if es == 0 else -math.acos(cq3)
+                            q2 = math.atan2(wu, wv) - math.atan2(L2 * math.sin(q3), L1 + L2 * math.cos(q3))
+                            q4 = (phi - q2 - q3 + math.pi) % two_pi - math.pi
+                            if q2 < -math.pi / 2 or q2 > math.pi / 2:
+                                continue
+                            if q3 < -lim or q3 > lim or q4 < -lim or q4 > lim:
+                                continue
+                            d1 = (q1 - prev[0] + math.pi) % two_pi - math.pi
+                            d2 = (q2 - prev[1] + math.pi) % two_pi - math.pi
+                            d3 = (q3 - prev[2] + math.pi) % two_pi - math.pi
+                            d4 = (q4 - prev[3] + math.pi) % two_pi - math.pi
+                            c = 10.0 * d1 * d1 + d2 * d2 + d3 * d3 + 2.0 * d4 * d4
+                            if c < best_cost:
+                                best_cost = c
+                                bq1, bq2, bq3, bq4 = q1, q2, q3, q4
+                                found = True
+            if not found:
+                continue
+            ok[i] = True
+            angles[i, 0], angles[i, 1], angles[i, 2], angles[i, 3] = bq1, bq2, bq3, bq4
+            prev[0], prev[1], prev[2], prev[3] = bq1, bq2, bq3, bq4
+            # Bone points in the yaw frame, then rotated into world
+            cy, sy = math.cos(bq1), math.sin(bq1)
+            t3 = bq2 + bq3
+            t4 = t3 + bq4
+            shoulder_x = -shoulder_len
+            ankle_y = base_len + ankle_len * math.cos(bq2)
+            ankle_z = ankle_len * math.sin(bq2)
+            forearm_x = shoulder_x + ankle2_len
+            wrist_y = ankle_y + forearm_len * math.cos(t3)
+            wrist_z = ankle_z + forearm_len * math.sin(t3)
+            wl_x = forearm_x - 4.0
+            eff_y = wrist_y + L3 * math.cos(t4)
+            eff_z = wrist_z + L3 * math.sin(t4)
+            px = np.array([0.0, 0.0, shoulder_x, shoulder_x, forearm_x, forearm_x, wl_x, wl_x], np.float32)
+            py = np.array([0.0, base_len, base_len, ankle_y, ankle_y, wrist_y, wrist_y, eff_y], np.float32)
+            pz = np.array([0.0, 0.0, 0.0, ankle_z, ankle_z, wrist_z, wrist_z, eff_z], np.float32)
+            for j in range(8):
+                pts[i, j, 0] = px[j] * cy + pz[j] * sy
+                pts[i, j, 1] = py[j] - 1.0
+                pts[i, j, 2] = -px[j] * sy + pz[j] * cy
+        return angles, pts, ok
+
+
+_candidate_cost = None
+if njit is not None:
+    @njit(cache=True, fastmath=True)
+    def _candidate_cost(ik_vec, base_vec, prev_q, eff_q, have_prev_q):  # pragma: no cover - compiled
+        # Weighted squared joint deltas (indices/weights match solution_cost)
+        # plus the orientation-continuity term, all in one compiled body
+        two_pi = 2.0 * math.pi
+        d1 = (ik_vec[1] - base_vec[1] + math.pi) % two_pi - math.pi
+        d2 = (ik_vec[2] - base_vec[2] + math.pi) % two_pi - math.pi
+        d3 = (ik_vec[3] - base_vec[3] + math.pi) % two_pi - math.pi
+        d4 = (ik_vec[4] - base_vec[4] + math.pi) % two_pi - math.pi
+        c = 10.0 * d1 * d1 + d2 * d2 + d3 * d3 + 2.0 * d4 * d4
+        if have_prev_q:
+            dot = (prev_q[0] * eff_q[0] + prev_q[1] * eff_q[1]
+                   + prev_q[2] * eff_q[2] + prev_q[3] * eff_q[3])
+            if dot < 0.0:
+                dot = -dot
+            if dot > 1.0:
+                dot = 1.0
+            ang = 2.0 * math.acos(dot)
+            c += 4.0 * ang * ang
+        return c
+
+
+_BATCH_BONES = [
+    ("base", 0, 1),
+    ("shoulder", 1, 2),
+    ("ankle", 2, 3),
+    ("ankle2", 3, 4),
+    ("forearm", 4, 5),
+    ("wrist_left", 5, 6),
+    ("wrist_up", 6, 7),
+]
+
+
+def _pose_from_batch(angles_row, pts_row):
+    """Build one pose dict from a row of the batch kernel's output."""
+    return {
+        "angles": {
+            "baseYawDeg": clamp(to_deg(angles_row[0]), -180.0, 180.0),
+            "shoulderPitchDeg": clamp(to_deg(angles_row[1]), -90.0, 90.0),
+            "forearmPitchDeg": clamp(to_deg(angles_row[2]), -135.0, 135.0),
+            "wristPitchDeg": clamp(to_deg(angles_row[3]), -135.0, 135.0),
+        },
+        # Row views go straight to the serializer (orjson handles numpy
+        # natively; the stdlib fallback unwraps via its default hook)
+        "bones": [
+            {"name": name, "start": pts_row[i], "end": pts_row[j]}
+            for (name, i, j) in _BATCH_BONES
+        ],
+        "effector": pts_row[7],
+    }
+
+
 def build_chain(cfg):
-    base_len = float(cfg.get("baseLength", 3))
-    shoulder_len = float(cfg.get("shoulderLength", 4))
-    ankle_len = float(cfg.get("ankleLength", 10))
-    ankle2_len = float(cfg.get("ankle2Length", 4))
-    forearm_len = float(cfg.get("forearmLength", 10))
-
-    # We construct a chain with 12 links (4 actuated joints), ensuring each revolute joint is followed by a fixed-length link
-    # so the rotation affects the end-effector position:
+    _import_ikpy()
+    return _build_chain_cached(
+        float(cfg.get("baseLength", 3)),
+        float(cfg.get("shoulderLength", 4)),
+        float(cfg.get("ankleLength", 10)),
+        float(cfg.get("ankle2Length", 4)),
+        float(cfg.get("forearmLength", 10)),
+    )
+
+
+# Chains are reused across all calls in a worker's lifetime; lengths only
+# change if the UI config does, so a small LRU is plenty
+@lru_cache(maxsize=8)
+def _build_chain_cached(base_len, shoulder_len, ankle_len, ankle2_len, forearm_len):
+
+    # We construct a chain with only the 4 actuated joints; the fixed links
+    # (base up, shoulder -X, ankle +Y, ankle2 +X, forearm +Y, wrist -X/+Y)
+    # carry no rotation of their own, so each run of them collapses into the
+    # origin_translation of the following joint (or one trailing fixed link
+    # for the effector). Shorter FK matrix chain, fewer Jacobian columns;
+    # bone endpoints are recovered from the joint frames in solve_pose.
     # 1) base_yaw (rot-y)
-    # 2) base_len (fixed)
-    # 3) shoulder_joint (rot-x)
-    # 4) shoulder_link (fixed -X)
-    # 5) ankle_link (fixed +Y)
-    # 6) ankle2_link (fixed +X)
-    # 7) forearm_joint (rot-x)
-    # 8) forearm_link (fixed +Y)
-    # 9) wrist_joint (rot-x)
-    # 10) wrist_left (fixed -X, length=4)
-    # 11) wrist_up (fixed +Y, length=5)
+    # 2) shoulder_joint (rot-x), absorbs base_len up
+    # 3) forearm_joint (rot-x), absorbs shoulder -X + ankle +Y + ankle2 +X
+    # 4) wrist_joint (rot-x), absorbs forearm +Y
+    # 5) effector (fixed), wrist -X by 4 and +Y by 5
 
     return Chain(name="robot_arm", links=[
         OriginLink(),
@@ -111,93 +486,54 @@ def build_chain(cfg):
             bounds=(-math.pi, math.pi),
             joint_type="revolute",
         ),
-        # Base fixed link up
-        URDFLink(
-            name="base",
-            origin_translation=[0.0, base_len, 0.0],
-            origin_orientation=[0.0, 0.0, 0.0],
-            joint_type="fixed",
-        ),
-        # Shoulder joint: revolute around X (pitch)
+        # Shoulder joint: revolute around X (pitch), sits base_len up
         URDFLink(
             name="shoulder_joint",
-            origin_translation=[0.0, 0.0, 0.0],
+            origin_translation=[0.0, base_len, 0.0],
             origin_orientation=[0.0, 0.0, 0.0],
             rotation=[1.0, 0.0, 0.0],
             bounds=(-math.pi/2, math.pi/2),
             joint_type="revolute",
         ),
-        # Shoulder link: fixed -X
-        URDFLink(
-            name="shoulder",
-            origin_translation=[-shoulder_len, 0.0, 0.0],
-            origin_orientation=[0.0, 0.0, 0.0],
-            joint_type="fixed",
-        ),
-        # Ankle: fixed up
-        URDFLink(
-            name="ankle",
-            origin_translation=[0.0, ankle_len, 0.0],
-            origin_orientation=[0.0, 0.0, 0.0],
-            joint_type="fixed",
-        ),
-        # Ankle2: fixed +X
-        URDFLink(
-            name="ankle2",
-            origin_translation=[ankle2_len, 0.0, 0.0],
-            origin_orientation=[0.0, 0.0, 0.0],
-            joint_type="fixed",
-        ),
         # Forearm joint: revolute around X (same axis as shoulder)
         URDFLink(
             name="forearm_joint",
-            origin_translation=[0.0, 0.0, 0.0],
+            origin_translation=[ankle2_len - shoulder_len, ankle_len, 0.0],
             origin_orientation=[0.0, 0.0, 0.0],
             rotation=[1.0, 0.0, 0.0],
             bounds=(-3*math.pi/4, 3*math.pi/4),
             joint_type="revolute",
         ),
-        # Forearm link: fixed +Y
-        URDFLink(
-            name="forearm",
-            origin_translation=[0.0, forearm_len, 0.0],
-            origin_orientation=[0.0, 0.0, 0.0],
-            joint_type="fixed",
-        ),
         # Wrist joint at forearm tip: revolute around X
         URDFLink(
             name="wrist_joint",
-            origin_translation=[0.0, 0.0, 0.0],
+            origin_translation=[0.0, forearm_len, 0.0],
             origin_orientation=[0.0, 0.0, 0.0],
             rotation=[1.0, 0.0, 0.0],
             bounds=(-3*math.pi/4, 3*math.pi/4),
             joint_type="revolute",
         ),
-        # Wrist left: fixed -X by 4
+        # Effector: fixed -X by 4 then +Y by 5
         URDFLink(
-            name="wrist_left",
-            origin_translation=[-4.0, 0.0, 0.0],
-            origin_orientation=[0.0, 0.0, 0.0],
-            joint_type="fixed",
-        ),
-        # Wrist up: fixed +Y by 5
-        URDFLink(
-            name="wrist_up",
-            origin_translation=[0.0, 5.0, 0.0],
+            name="effector",
+            origin_translation=[-4.0, 5.0, 0.0],
             origin_orientation=[0.0, 0.0, 0.0],
             joint_type="fixed",
         ),
     ])
 
 
-def main():
-    raw = sys.stdin.read()
+def handle(payload):
+    # Nothing a single request contains may take down the worker: anything
+    # thrown outside _handle's own error handling (non-dict payloads,
+    # non-numeric config values, ...) still becomes a per-request error
     try:
-        payload = json.loads(raw)
-    except Exception:
-        print(json.dumps({"error": "Invalid JSON input"}))
-        sys.exit(1)
+        return _handle(payload)
+    except Exception as e:
+        return {"error": "IK failed", "details": str(e)}
 
+
+def _handle(payload):
     target = payload.get("target")
     origin = payload.get("origin")
     fractions = payload.get("fractions")
@@ -205,47 +541,83 @@ def main():
     # ctraj required; no linear fallback
     ctraj_steps = payload.get("ctrajSteps")
     if not isinstance(target, list) or len(target) != 3:
-        print(json.dumps({"error": "Invalid target"}))
-        sys.exit(1)
+        return {"error": "Invalid target"}
 
-    chain = build_chain(cfg)
+    # Geometry shared by every pose in this request
+    geom = build_geom(cfg)
+    base_len, shoulder_len, ankle_len, ankle2_len, forearm_len = geom[:5]
 
-    # Helper to solve IK and return (pose, ik_vector, eff_rot3x3)
+    # Helper to solve IK and return (pose, ik_vector, effector quaternion)
     def solve_pose(target_pos, init_guess, target_frame=None):
         # Ensure init guess length matches links
-        if not isinstance(init_guess, list) or len(init_guess) != len(chain.links):
-            init_guess = [0.0 for _ in chain.links]
-        ik = None
-        # Try full-pose IK when possible
-        if target_frame is not None:
-            try:
-                # Preferred API (available in newer ikpy)
-                ik = chain.inverse_kinematics_frame(target_frame, initial_position=init_guess)  # type: ignore[attr-defined]
-            except Exception:
-                # Fallback to position-only if full frame isn't supported
-                ik = chain.inverse_kinematics(target_position=target_pos, initial_position=init_guess)
-        else:
-            ik = chain.inverse_kinematics(target_position=target_pos, initial_position=init_guess)
-        frames = chain.forward_kinematics(ik, full_kinematics=True)
-        pts = [vec_from_frame(f) for f in frames]
-        eff_rot = rot_from_frame(frames[-1])
-        bone_defs = [
-            ("base", 1, 2),
-            ("shoulder", 2, 4),
-            ("ankle", 4, 5),
-            ("ankle2", 5, 6),
-            ("forearm", 6, 8),
-            ("wrist_left", 8, 10),
-            ("wrist_up", 10, 11),
-        ]
+        if not isinstance(init_guess, list) or len(init_guess) != N_LINKS:
+            init_guess = _ZERO_INIT
+        # Closed-form solve; fall back to the iterative optimizer only for
+        # targets the analytic candidates cannot reach within joint bounds
+        ik = analytic_ik(geom, target_pos, init_guess, N_LINKS, target_frame=target_frame)
+        if ik is None:
+            # Cap optimizer iterations: millimetre accuracy is plenty for the
+            # UI and the warm start converges in a handful of steps anyway
+            chain = build_chain(cfg)
+            if target_frame is not None:
+                try:
+                    # Preferred API (available in newer ikpy)
+                    ik = chain.inverse_kinematics_frame(target_frame, initial_position=init_guess, max_iter=16)  # type: ignore[attr-defined]
+                except Exception:
+                    # Fallback to position-only if full frame isn't supported
+                    ik = chain.inverse_kinematics(target_position=target_pos, initial_position=init_guess, max_iter=16)
+            else:
+                ik = chain.inverse_kinematics(target_position=target_pos, initial_position=init_guess, max_iter=16)
+        # Bone endpoints follow directly from the four joint angles: every
+        # point is a fixed offset in the yaw frame (X offsets sit on the pitch
+        # axis, Y offsets rotate by the accumulated pitch), so no
+        # forward_kinematics call is needed at all
+        q1, q2 = float(ik[1]), float(ik[2])
+        t3 = q2 + float(ik[3])
+        t4 = t3 + float(ik[4])
+        cy, sy = math.cos(q1), math.sin(q1)
+
+        def world(x, y, z):
+            # yaw-frame point -> world: rotate about Y, then the base -1 drop
+            return [x * cy + z * sy, y - 1.0, -x * sy + z * cy]
+
+        shoulder_x = -shoulder_len
+        ankle_y = base_len + ankle_len * math.cos(q2)
+        ankle_z = ankle_len * math.sin(q2)
+        forearm_x = shoulder_x + ankle2_len
+        wrist_y = ankle_y + forearm_len * math.cos(t3)
+        wrist_z = ankle_z + forearm_len * math.sin(t3)
+        wrist_left_x = forearm_x - 4.0
+        eff_y = wrist_y + 5.0 * math.cos(t4)
+        eff_z = wrist_z + 5.0 * math.sin(t4)
+
+        base_start = world(0.0, 0.0, 0.0)
+        shoulder_start = world(0.0, base_len, 0.0)
+        shoulder_end = world(shoulder_x, base_len, 0.0)
+        ankle_end = world(shoulder_x, ankle_y, ankle_z)
+        ankle2_end = world(forearm_x, ankle_y, ankle_z)
+        forearm_end = world(forearm_x, wrist_y, wrist_z)
+        wrist_left_end = world(wrist_left_x, wrist_y, wrist_z)
+        effector = world(wrist_left_x, eff_y, eff_z)
+
+        # Effector orientation as a quaternion: q = qy(yaw) * qx(total pitch)
+        hy, hp = 0.5 * q1, 0.5 * t4
+        cy2, sy2 = math.cos(hy), math.sin(hy)
+        cp2, sp2 = math.cos(hp), math.sin(hp)
+        eff_quat = np.array([cy2 * cp2, cy2 * sp2, sy2 * cp2, -sy2 * sp2])
         bones_loc = [
-            {"name": n, "start": pts[i], "end": pts[j]}
-            for (n, i, j) in bone_defs
+            {"name": "base", "start": base_start, "end": shoulder_start},
+            {"name": "shoulder", "start": shoulder_start, "end": shoulder_end},
+            {"name": "ankle", "start": shoulder_end, "end": ankle_end},
+            {"name": "ankle2", "start": ankle_end, "end": ankle2_end},
+            {"name": "forearm", "start": ankle2_end, "end": forearm_end},
+            {"name": "wrist_left", "start": forearm_end, "end": wrist_left_end},
+            {"name": "wrist_up", "start": wrist_left_end, "end": effector},
         ]
         base_yaw_loc = to_deg(ik[1])
-        shoulder_pitch_loc = to_deg(ik[3])
-        forearm_pitch_loc = to_deg(ik[7])
-        wrist_pitch_loc = to_deg(ik[9])
+        shoulder_pitch_loc = to_deg(ik[2])
+        forearm_pitch_loc = to_deg(ik[3])
+        wrist_pitch_loc = to_deg(ik[4])
         return ({
             "angles": {
                 "baseYawDeg": clamp(base_yaw_loc, -180.0, 180.0),
@@ -254,168 +626,220 @@ def main():
                 "wristPitchDeg": clamp(wrist_pitch_loc, -135.0, 135.0),
             },
             "bones": bones_loc,
-            "effector": pts[-1],
-        }, ik, eff_rot)
+            "effector": effector,
+        }, ik, eff_quat)
 
     # Prefer continuity: evaluate multiple initial guesses and choose solution closest to prev_ik and orientation
+    # Candidate buffer for the miss path, allocated once per request and
+    # refilled in place at each waypoint
+    nudge_deltas = np.array([-0.5, 0.5, -1.0, 1.0])
+    inits_buf = np.empty((nudge_deltas.shape[0], N_LINKS))
+    # Actuated-joint columns and their weights for the vectorized scorer
+    cost_idx = np.array([1, 2, 3, 4])
+    cost_w = np.array([10.0, 1.0, 1.0, 2.0])
+
     def solve_pose_prefer_continuity(target_pos, prev_ik_vec, target_frame=None, prev_eff_rot=None):
         # Base candidate: previous ik
-        candidates = []
-        base = list(prev_ik_vec) if isinstance(prev_ik_vec, list) and len(prev_ik_vec) == len(chain.links) else [0.0 for _ in chain.links]
-        candidates.append(base)
-        # Nudge shoulder/forearm/wrist up/down to escape wrong basin if needed
-        for delta in (-0.5, 0.5, -1.0, 1.0):
-            alt = list(base)
-            alt[3] = clamp(alt[3] + delta, -math.pi/2, math.pi/2)
-            alt[7] = clamp(alt[7] - delta, -3*math.pi/4, 3*math.pi/4)
-            alt[9] = clamp(alt[9] - delta, -3*math.pi/4, 3*math.pi/4)
-            candidates.append(alt)
-        best = None
-        best_cost = None
-        best_ik = None
-        best_rot = None
+        base = list(prev_ik_vec) if isinstance(prev_ik_vec, list) and len(prev_ik_vec) == N_LINKS else _ZERO_INIT
+        # Warm start converges on the common path; only fan out to nudged
+        # guesses when the warm-started solve misses the target
+        pose, ik_vec, eff_quat = solve_pose(target_pos, base, target_frame=target_frame)
+        err = np.linalg.norm(np.asarray(pose["effector"]) - np.asarray(target_pos, dtype=np.float64))
+        if err < 1e-3:
+            return pose, ik_vec, eff_quat
+        # Nudge shoulder/forearm/wrist up/down to escape wrong basin if
+        # needed: refill the shared buffer, columns written vectorized
+        base_arr = np.asarray(base, dtype=np.float64)
+        np.copyto(inits_buf, base_arr)
+        inits_buf[:, 2] = np.clip(base_arr[2] + nudge_deltas, -math.pi/2, math.pi/2)
+        inits_buf[:, 3] = np.clip(base_arr[3] - nudge_deltas, -3*math.pi/4, 3*math.pi/4)
+        inits_buf[:, 4] = np.clip(base_arr[4] - nudge_deltas, -3*math.pi/4, 3*math.pi/4)
+        # Rows become lists only at the solver boundary
+        candidates = inits_buf.tolist()
         # Weights for joint deltas (strongest penalty on base yaw to discourage sweeping)
-        joint_weights = {1: 10.0, 3: 1.0, 7: 1.0, 9: 2.0}
+        joint_weights = {1: 10.0, 2: 1.0, 3: 1.0, 4: 2.0}
         orientation_weight = 4.0  # scales radians^2 contribution
-        for init in candidates:
-            pose, ik_vec, eff_rot = solve_pose(target_pos, init, target_frame=target_frame)
-            # cost: weighted squared L2 over actuated joints [1,3,7,9]
+        have_prev = isinstance(prev_eff_rot, np.ndarray)
+        prev_q = prev_eff_rot if have_prev else np.array([1.0, 0.0, 0.0, 0.0])
+
+        def solution_cost(ik_v, rot):
+            if _candidate_cost is not None:
+                return float(_candidate_cost(
+                    np.asarray(ik_v, dtype=np.float64), base_arr, prev_q, rot, have_prev))
+            # weighted squared L2 over actuated joints [1,2,3,4]
             cost = 0.0
-            for j in (1, 3, 7, 9):
-                dj = angle_diff(ik_vec[j], base[j])
+            for j in (1, 2, 3, 4):
+                dj = angle_diff(ik_v[j], base[j])
                 wj = joint_weights.get(j, 1.0)
                 cost += wj * dj * dj
             # orientation continuity penalty if previous effector rotation is known
-            if isinstance(prev_eff_rot, np.ndarray):
+            if have_prev:
                 try:
-                    ang = orientation_angle_between(prev_eff_rot, eff_rot)
+                    ang = orientation_angle_between(prev_eff_rot, rot)
                     cost += orientation_weight * ang * ang
                 except Exception:
                     pass
-            if best is None or cost < best_cost:
-                best = pose
-                best_cost = cost
-                best_ik = ik_vec
-                best_rot = eff_rot
+            return cost
+
+        best, best_ik, best_rot = pose, ik_vec, eff_quat
+        best_cost = solution_cost(ik_vec, eff_quat)
+        # The nudged solves are independent; run them concurrently (the
+        # optimizer fallback spends its time inside SciPy, which releases
+        # the GIL)
+        with ThreadPoolExecutor(max_workers=len(candidates)) as ex:
+            results = list(ex.map(
+                lambda init: solve_pose(target_pos, init, target_frame=target_frame), candidates))
+        # Score every candidate in one vectorized pass and argmin
+        ik_mat = np.array([np.asarray(r[1], dtype=np.float64) for r in results])
+        d = (ik_mat[:, cost_idx] - base_arr[cost_idx] + math.pi) % (2.0 * math.pi) - math.pi
+        costs = (d * d * cost_w).sum(axis=1)
+        if have_prev:
+            dots = np.abs(np.stack([r[2] for r in results]) @ prev_q)
+            ang = 2.0 * np.arccos(np.minimum(dots, 1.0))
+            costs += orientation_weight * ang * ang
+        bi = int(np.argmin(costs))
+        if costs[bi] < best_cost:
+            best, best_ik, best_rot = results[bi]
         return best, best_ik, best_rot
 
     try:
         if isinstance(origin, list) and len(origin) == 3:
-            # Validate and build fractions list (exclusive of 0 and 1)
+            # Validate and build fractions list (exclusive of 0 and 1);
+            # np.unique also sorts, so no separate sorted() pass
             fracs: list[float] = []
             if isinstance(fractions, list) and len(fractions) > 0:
-                for f in fractions:
-                    try:
-                        fv = float(f)
-                        if 0.0 < fv < 1.0:
-                            fracs.append(fv)
-                    except Exception:
-                        pass
-                fracs = sorted(list(dict.fromkeys(fracs)))
+                try:
+                    arr = np.asarray(fractions, dtype=np.float64)
+                    arr = np.unique(arr[(arr > 0.0) & (arr < 1.0)])
+                    fracs = arr.tolist()
+                except (TypeError, ValueError):
+                    # Non-numeric entries: fall back to the per-element filter
+                    for f in fractions:
+                        try:
+                            fv = float(f)
+                            if 0.0 < fv < 1.0:
+                                fracs.append(fv)
+                        except Exception:
+                            pass
+                    fracs = sorted(list(dict.fromkeys(fracs)))
             else:
                 fracs = [0.25, 0.5, 0.75]
 
             intermediates = []
-            prev_ik = [0.0 for _ in chain.links]
+            prev_ik = _ZERO_INIT
             prev_rot = None
 
-            # Require Robotics Toolbox ctraj/SE3 interpolation
-            try:
-                # Lazy import here to avoid cold-start penalty when not used
-                global SE3, ctraj
-                if SE3 is None or ctraj is None:
-                    try:
-                        from spatialmath import SE3 as _SE3  # type: ignore
-                        try:
-                            from roboticstoolbox.tools.trajectory import ctraj as _ctraj  # type: ignore
-                        except Exception:
-                            _ctraj = None  # type: ignore
-                        SE3 = _SE3  # type: ignore
-                        ctraj = _ctraj  # type: ignore
-                    except Exception:
-                        SE3 = None  # type: ignore
-                        ctraj = None  # type: ignore
-                if SE3 is None or ctraj is None:
-                    raise RuntimeError("Robotics Toolbox not available")
-                T0 = SE3(float(origin[0]), float(origin[1]), float(origin[2]))
-                T1 = SE3(float(target[0]), float(target[1]), float(target[2]))
-                # Normalize quaternion sign to avoid 360° slerp when orientations are equivalent
-                try:
-                    A0n = T0.A  # type: ignore
-                    A1n = T1.A  # type: ignore
-                    A1n = normalize_quaternion_sign_for_endpoints(A0n, A1n)
-                    # Re-wrap into SE3 if possible
-                    try:
-                        T1 = SE3(A1n)  # type: ignore
-                    except Exception:
-                        pass
-                except Exception:
-                    pass
-                # Seed baseline by solving the origin pose to capture initial orientation
-                _, prev_ik, prev_rot = solve_pose_prefer_continuity([float(origin[0]), float(origin[1]), float(origin[2])], prev_ik, target_frame=T0.A, prev_eff_rot=None)
-                if isinstance(ctraj_steps, int) and ctraj_steps > 1:
-                    Ts = ctraj(T0, T1, int(ctraj_steps))
-                    # Ts may be a numpy array of shape (4,4,N) or an iterable of SE3
-                    if hasattr(Ts, "shape") and len(getattr(Ts, "shape", [])) == 3:
-                        n = Ts.shape[2]  # type: ignore
-                        for k in range(1, max(0, n - 1)):
-                            A = Ts[:, :, k]  # type: ignore
-                            t = [float(A[0, 3]), float(A[1, 3]), float(A[2, 3])]
-                            pose, prev_ik, prev_rot = solve_pose_prefer_continuity(t, prev_ik, target_frame=A, prev_eff_rot=prev_rot)
-                            intermediates.append(pose)
-                    elif hasattr(Ts, "__iter__"):
-                        seq = list(Ts)
-                        L = len(seq)
-                        for idx, T in enumerate(seq):
-                            if idx == 0 or idx == L - 1:
-                                continue
-                            t = getattr(T, "t", None)
-                            if t is None and hasattr(T, "A"):
-                                A = T.A  # type: ignore
-                                t = [float(A[0, 3]), float(A[1, 3]), float(A[2, 3])]
-                                pose, prev_ik, prev_rot = solve_pose_prefer_continuity(t, prev_ik, target_frame=A, prev_eff_rot=prev_rot)
-                                intermediates.append(pose)
-                            elif t is not None:
-                                t = [float(t[0]), float(t[1]), float(t[2])]
-                                pose, prev_ik, prev_rot = solve_pose_prefer_continuity(t, prev_ik, target_frame=T.A if hasattr(T, "A") else None, prev_eff_rot=prev_rot)
-                                intermediates.append(pose)
-                            else:
-                                continue
+            # Endpoint frames are pure translations built directly in numpy;
+            # the closed-form SLERP batch replaced ctraj/SE3 interp outright,
+            # so neither spatialmath nor roboticstoolbox is ever imported
+            A0_c = np.eye(4)
+            A0_c[:3, 3] = [float(origin[0]), float(origin[1]), float(origin[2])]
+            A1_c = np.eye(4)
+            A1_c[:3, 3] = [float(target[0]), float(target[1]), float(target[2])]
+            # Normalize quaternion sign to avoid 360° slerp when orientations are equivalent
+            A1_c = np.ascontiguousarray(
+                np.asarray(normalize_quaternion_sign_for_endpoints(A0_c, A1_c), dtype=np.float64))
+            if isinstance(ctraj_steps, int) and ctraj_steps > 1:
+                ts_f = np.linspace(0.0, 1.0, int(ctraj_steps))
+            else:
+                ts_f = np.concatenate(([0.0], np.asarray(fracs, dtype=np.float64), [1.0]))
+            Ts_np = _interp_se3_batch(A0_c, A1_c, ts_f)
+            # Waypoint rows 0..N-1 including both endpoints
+            targets_all = np.ascontiguousarray(Ts_np[:, :3, 3])
+            frames_seq = Ts_np
+
+            n_all = targets_all.shape[0]
+            final_pose = None
+            if _solve_batch is not None:
+                # One compiled pass over the whole trajectory (row 0 seeds the
+                # warm start, last row is the final target)
+                params = np.asarray(geom[:5], dtype=DTYPE)
+                angles_b, pts_b, ok_b = _solve_batch(targets_all.astype(DTYPE), params, np.zeros(4, DTYPE))
+                if bool(ok_b.all()):
+                    intermediates = [_pose_from_batch(angles_b[k], pts_b[k]) for k in range(1, n_all - 1)]
+                    final_pose = _pose_from_batch(angles_b[n_all - 1], pts_b[n_all - 1])
+
+            if final_pose is None:
+                # Per-point fallback: no numba, or a waypoint the closed form
+                # can't reach (the optimizer path needs per-point handling).
+                # Seed baseline by solving the origin pose first.
+                _, prev_ik, prev_rot = solve_pose_prefer_continuity(targets_all[0], prev_ik, target_frame=A0_c, prev_eff_rot=None)
+                for k in range(1, n_all - 1):
+                    pose, prev_ik, prev_rot = solve_pose_prefer_continuity(
+                        targets_all[k], prev_ik, target_frame=frames_seq[k], prev_eff_rot=prev_rot)
+                    intermediates.append(pose)
+
+                # Skip the final solve when the last intermediate already
+                # landed on the target (fractions are filtered to (0,1) so
+                # this only happens with a fraction effectively equal to 1)
+                if intermediates and np.linalg.norm(
+                        np.asarray(intermediates[-1]["effector"]) - np.asarray(target, dtype=np.float64)) < 1e-9:
+                    final_pose = intermediates[-1]
                 else:
-                    for f in sorted(fracs):
-                        Ti = T0.interp(T1, float(f))
-                        t = Ti.t
-                        p = [float(t[0]), float(t[1]), float(t[2])]
-                        pose, prev_ik, prev_rot = solve_pose_prefer_continuity(p, prev_ik, target_frame=Ti.A if hasattr(Ti, "A") else None, prev_eff_rot=prev_rot)
-                        intermediates.append(pose)
-            except Exception as e:
-                print(json.dumps({"error": "ctraj required", "details": str(e)}))
-                sys.exit(2)
-
-            final_pose, _, _ = solve_pose_prefer_continuity(target, prev_ik, target_frame=T1.A, prev_eff_rot=prev_rot)
-            out = {
-                "intermediates": intermediates,
-                "final": final_pose,
-                # Back-compat top-level mirrors final
-                "angles": final_pose["angles"],
-                "bones": final_pose["bones"],
-                "effector": final_pose["effector"],
-            }
-            print(json.dumps(out))
+                    final_pose, _, _ = solve_pose_prefer_continuity(
+                        target, prev_ik, target_frame=A1_c, prev_eff_rot=prev_rot)
         else:
-            base_init = [0.0 for _ in chain.links]
-            final_pose, _ = solve_pose(target, base_init)
-            out = {
-                "intermediates": [],
-                "final": final_pose,
-                "angles": final_pose["angles"],
-                "bones": final_pose["bones"],
-                "effector": final_pose["effector"],
-            }
-            print(json.dumps(out))
+            intermediates = []
+            final_pose = None
+            if _solve_batch is not None:
+                # Single-shot solves go through the compiled kernel too
+                t_np = np.asarray([target], dtype=DTYPE)
+                angles_b, pts_b, ok_b = _solve_batch(t_np, np.asarray(geom[:5], dtype=DTYPE), np.zeros(4, DTYPE))
+                if bool(ok_b[0]):
+                    final_pose = _pose_from_batch(angles_b[0], pts_b[0])
+            if final_pose is None:
+                final_pose, _, _ = solve_pose(target, _ZERO_INIT)
+
+        # Single output construction for every path; top level mirrors the
+        # final pose for back-compat
+        return {
+            "intermediates": intermediates,
+            "final": final_pose,
+            "angles": final_pose["angles"],
+            "bones": final_pose["bones"],
+            "effector": final_pose["effector"],
+        }
     except Exception as e:
-        print(json.dumps({"error": "IK failed", "details": str(e)}))
-        sys.exit(2)
+        return {"error": "IK failed", "details": str(e)}
+
+
+def serve():
+    # Long-lived worker: one JSON request per stdin line, one JSON response per
+    # stdout line. Amortizes interpreter startup, imports and the chain cache.
+    # Pay the remaining fixed cost (the numba compile) up front so the
+    # first request is as fast as the rest.
+    if _solve_batch is not None:
+        _solve_batch(np.zeros((2, 3), DTYPE), np.asarray(build_geom({})[:5], dtype=DTYPE), np.zeros(4, DTYPE))
+    for line in sys.stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            payload = loads(line)
+        except Exception:
+            out = {"error": "Invalid JSON input"}
+        else:
+            out = handle(payload)
+        sys.stdout.write(dumps(out) + "\n")
+        sys.stdout.flush()
+
+
+def main():
+    if "--serve" in sys.argv[1:]:
+        serve()
+        return
+
+    # One-shot mode (back-compat): whole stdin is a single JSON request
+    raw = sys.stdin.read()
+    try:
+        payload = loads(raw)
+    except Exception:
+        print(dumps({"error": "Invalid JSON input"}))
+        sys.exit(1)
+    out = handle(payload)
+    print(dumps(out))
+    if "error" in out:
+        sys.exit(1 if out["error"] == "Invalid target" else 2)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import { NextRequest, NextResponse } from 'next/server';
-import { spawn } from 'child_process';
-import path from 'path';
+import { solveIk } from '@/lib/ikWorker';
 
 export const runtime = 'nodejs';
 
@@ -12,10 +11,6 @@ export async function POST(req: NextRequest) {
     if (!target || !Array.isArray(target) || target.length !== 3) {
       return NextResponse.json({ error: 'Invalid target' }, { status: 400 });
     }
-    const projectRoot = process.cwd();
-    const scriptPath = path.join(projectRoot, 'scripts', 'ik_solver.py');
-    const venvPython = path.join(projectRoot, '.venv', 'bin', 'python');
-    const py = spawn(venvPython, [scriptPath], { stdio: ['pipe', 'pipe', 'pipe'] });
 
     const payload = {
       target,
@@ -31,69 +26,19 @@ export async function POST(req: NextRequest) {
       use_ctraj: true,
       ctrajSteps: 6,
     };
-    const input = JSON.stringify(payload);
 
-    const stdoutChunks: Buffer[] = [];
-    const stderrChunks: Buffer[] = [];
-    py.stdout.on('data', (d) => {
-      const buf = Buffer.isBuffer(d) ? d : Buffer.from(d);
-      stdoutChunks.push(buf);
-    });
-    py.stderr.on('data', (d) => {
-      const buf = Buffer.isBuffer(d) ? d : Buffer.from(d);
-      stderrChunks.push(buf);
-      try {
-        // Forward solver stderr to Next.js/server stderr so it appears in logs
-        process.stderr.write(buf);
-      } catch {}
-    });
-
-    let resolved = false;
-    let timedOut = false;
-    const done = new Promise<{ code: number | null; timedOut: boolean }>((resolve) => {
-      py.on('close', (code) => {
-        if (!resolved) {
-          resolved = true;
-          resolve({ code, timedOut });
-        }
-      });
-      py.on('error', () => {
-        if (!resolved) {
-          resolved = true;
-          resolve({ code: -1, timedOut: false });
-        }
-      });
-    });
-
-    py.stdin.write(input);
-    py.stdin.end();
-
-    const timer = setTimeout(() => {
-      if (!resolved) {
-        timedOut = true;
-        try {
-          py.kill('SIGKILL');
-        } catch {}
-      }
-    }, 20000);
-
-    const result = await done;
-    clearTimeout(timer);
-
-    if (result.code !== 0) {
-      const errStr = Buffer.concat(stderrChunks).toString('utf8');
-      const details =
-        errStr && errStr.trim().length > 0
-          ? errStr
-          : `code=${result.code}${result.timedOut ? ' (timeout)' : ''}`;
-      return NextResponse.json({ error: 'Python solver failed', details }, { status: 500 });
-    }
-    const outStr = Buffer.concat(stdoutChunks).toString('utf8');
     let data: unknown;
     try {
-      data = JSON.parse(outStr);
-    } catch {
-      return NextResponse.json({ error: 'Invalid JSON from python' }, { status: 500 });
+      data = await solveIk(payload);
+    } catch (err) {
+      const details = err instanceof Error ? err.message : 'unknown error';
+      return NextResponse.json({ error: 'Python solver failed', details }, { status: 500 });
+    }
+    // The worker reports failures in-band; keep the route's error contract
+    // (baseline mapped solver failures to non-2xx statuses)
+    if (data && typeof data === 'object' && 'error' in data) {
+      const status = (data as { error?: unknown }).error === 'Invalid target' ? 400 : 500;
+      return NextResponse.json(data, { status });
     }
     return NextResponse.json(data);
   } catch {
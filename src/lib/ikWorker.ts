@@ -0,0 +1,114 @@
+/*
+ * Long-lived IK solver worker. Spawns scripts/ik_solver.py --serve once and
+ * pipes newline-delimited JSON requests/responses over stdio, so repeated IK
+ * calls don't pay Python startup + ikpy import for every request.
+ */
+
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import path from 'path';
+
+const REQUEST_TIMEOUT_MS = 20000;
+
+type Pending = {
+  resolve: (value: unknown) => void;
+  reject: (err: Error) => void;
+  timer: NodeJS.Timeout;
+};
+
+type Worker = {
+  proc: ChildProcessWithoutNullStreams;
+  // Responses come back in request order, so a FIFO queue matches them up.
+  // The queue and line buffer belong to this worker generation only: a
+  // replacement worker must never fail or consume requests sent to another.
+  pending: Pending[];
+  buffer: string;
+};
+
+let worker: Worker | null = null;
+
+function failAllPending(w: Worker, err: Error): void {
+  while (w.pending.length > 0) {
+    const p = w.pending.shift();
+    if (p) {
+      clearTimeout(p.timer);
+      p.reject(err);
+    }
+  }
+}
+
+function ensureWorker(): Worker {
+  if (worker && worker.proc.exitCode === null && !worker.proc.killed) return worker;
+
+  const projectRoot = process.cwd();
+  const scriptPath = path.join(projectRoot, 'scripts', 'ik_solver.py');
+  const venvPython = path.join(projectRoot, '.venv', 'bin', 'python');
+  const py = spawn(venvPython, [scriptPath, '--serve'], { stdio: ['pipe', 'pipe', 'pipe'] });
+  const w: Worker = { proc: py, pending: [], buffer: '' };
+
+  py.stdout.on('data', (d) => {
+    w.buffer += d.toString('utf8');
+    let idx = w.buffer.indexOf('\n');
+    while (idx >= 0) {
+      const line = w.buffer.slice(0, idx);
+      w.buffer = w.buffer.slice(idx + 1);
+      const p = w.pending.shift();
+      if (p) {
+        clearTimeout(p.timer);
+        try {
+          p.resolve(JSON.parse(line));
+        } catch {
+          p.reject(new Error('Invalid JSON from python'));
+        }
+      }
+      idx = w.buffer.indexOf('\n');
+    }
+  });
+  py.stderr.on('data', (d) => {
+    try {
+      // Forward solver stderr to Next.js/server stderr so it appears in logs
+      process.stderr.write(Buffer.isBuffer(d) ? d : Buffer.from(d));
+    } catch {}
+  });
+  // Without a stdin error listener an EPIPE from writing to a worker that
+  // died after the liveness check would surface as an unhandled stream
+  // 'error' event and crash the server instead of failing the request
+  py.stdin.on('error', (err) => {
+    if (worker === w) worker = null;
+    failAllPending(w, err instanceof Error ? err : new Error('IK worker write failed'));
+  });
+  py.on('close', () => {
+    if (worker === w) worker = null;
+    failAllPending(w, new Error('IK worker exited'));
+  });
+  py.on('error', (err) => {
+    if (worker === w) worker = null;
+    failAllPending(w, err instanceof Error ? err : new Error('IK worker error'));
+  });
+
+  worker = w;
+  return w;
+}
+
+export async function solveIk(payload: unknown): Promise<unknown> {
+  const w = ensureWorker();
+  return new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      const idx = w.pending.findIndex((p) => p.timer === timer);
+      if (idx >= 0) w.pending.splice(idx, 1);
+      // A stuck worker would desync the response queue; kill and respawn
+      try {
+        w.proc.kill('SIGKILL');
+      } catch {}
+      reject(new Error('IK worker timeout'));
+    }, REQUEST_TIMEOUT_MS);
+    w.pending.push({ resolve, reject, timer });
+    try {
+      w.proc.stdin.write(JSON.stringify(payload) + '\n');
+    } catch (err) {
+      const idx = w.pending.findIndex((p) => p.timer === timer);
+      if (idx >= 0) w.pending.splice(idx, 1);
+      clearTimeout(timer);
+      reject(err instanceof Error ? err : new Error('IK worker write failed'));
+    }
+  });
+}